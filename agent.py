@@ -1,130 +1,306 @@
+import functools
+import io
 import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-from openai import OpenAI
-
+import cache
 import config
+import jsonutil
 import session
 import skills
 import tools
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 
-_client: OpenAI | None = None
+_client: "OpenAI | None" = None
 _model: str = ""
+_cache_enabled: bool = False
+_client_lock = threading.Lock()  # sub-agents may create the client from several threads
+
+# Max tool calls from one model response that run at the same time
+TOOL_CONCURRENCY_LIMIT = int(os.environ.get("AUTOCREW_TOOL_CONCURRENCY_LIMIT", "8"))
+
+# Older tool results longer than this are stored on disk and re-sent as a short stub
+TOOL_RESULT_INLINE_CHARS = 4000
+# The most recent tool results are always re-sent in full
+TOOL_RESULT_KEEP_RECENT = 4
+TOOL_RESULT_PREVIEW_CHARS = 500
+_STUB_PREFIX = "[truncated tool result"
+
+# Flush after every output block only when a person is watching; piped output stays buffered
+_INTERACTIVE = sys.stdout.isatty()
+
+# Pretty-print tool-call arguments in the response dump (default: only on a terminal)
+DEBUG_PRINT = os.environ.get("AUTOCREW_DEBUG_PRINT", "1" if _INTERACTIVE else "0") == "1"
+# Displayed tool-call arguments are cut off after this many characters
+PRETTY_ARGS_MAX_CHARS = 2000
+
+
+def _emit(text: str) -> None:
+    """Write a block of output with a single write (and at most one flush)."""
+    sys.stdout.write(text)
+    if _INTERACTIVE:
+        sys.stdout.flush()
+
+
+def _write(lines: list[str]) -> None:
+    _emit("\n".join(lines) + "\n")
 
 
 def chat(user_message: str) -> str:
-    global _client, _model
+    global _client, _model, _cache_enabled
     cfg = config.load()
-    _client = OpenAI()
+    # Reuse one client (and its HTTPS connection pool) for the whole session;
+    # only the model is re-read each turn since config may change
+    _client = _get_client()
     _model = cfg["model"]
+    _cache_enabled = cfg["cache_enabled"]
 
-    # Register the agent loop so spawn_agent can call it
-    tools.set_agent_loop(run_sub_agent)
-
-    # Build system prompt with available skills
-    system_prompt = cfg["system_prompt"]
-    skill_list = skills.list_skills()
-    if skill_list:
-        lines = ["\n\n## Available Skills\n"]
-        lines.append("Call the `use_skill` tool with the skill name to load its full instructions before performing it.\n")
-        for s in skill_list:
-            lines.append(f"- **{s['name']}**: {s['description']}")
-        system_prompt += "\n".join(lines)
+    skill_items = tuple((s["name"], s["description"]) for s in skills.list_skills())
+    system_prompt = _build_system_prompt(cfg["system_prompt"], skill_items)
 
-    session.append("user", user_message)
+    # Load history before queuing this turn, so load() never waits on the write
     history = session.load()
+    session.append("user", user_message)
     messages = [{"role": "system", "content": system_prompt}] + history
+    messages.append({"role": "user", "content": user_message})
 
-    reply = run_agent_loop(_client, _model, messages, tools.TOOL_SCHEMAS)
+    reply = run_agent_loop(_client, _model, messages, tools.TOOL_SCHEMAS, use_cache=_cache_enabled)
 
     session.append("assistant", reply)
     return reply
 
 
+@functools.lru_cache(maxsize=8)
+def _build_system_prompt(base_prompt: str, skill_items: tuple) -> str:
+    """Build the system prompt with available skills.
+    Memoized so every turn sends byte-identical content as message[0], which keeps
+    the provider's prompt-prefix cache warm. Nothing per-turn may go in here."""
+    if not skill_items:
+        return base_prompt
+    lines = ["\n\n## Available Skills\n"]
+    lines.append("Call the `use_skill` tool with the skill name to load its full instructions before performing it.\n")
+    for name, description in skill_items:
+        lines.append(f"- **{name}**: {description}")
+    return base_prompt + "\n".join(lines)
+
+
+def _get_client() -> "OpenAI":
+    global _client
+    with _client_lock:
+        if _client is None:
+            # Imported here so startup doesn't pay for loading the SDK (httpx, pydantic)
+            from openai import OpenAI
+
+            _client = OpenAI()
+        return _client
+
+
 def run_sub_agent(messages: list, sub_tools: list) -> str:
     """Entry point for spawn_agent — runs a child agent loop with restricted tools."""
-    return run_agent_loop(_client, _model, messages, sub_tools)
+    model, use_cache = _model, _cache_enabled
+    if not model:
+        # Not reached through chat() (e.g. team mode), so nothing has set the model yet
+        cfg = config.load()
+        model, use_cache = cfg["model"], cfg["cache_enabled"]
+    return run_agent_loop(_get_client(), model, messages, sub_tools, use_cache=use_cache)
 
 
-def _print_request(model: str, messages: list, iteration: int, tool_schemas: list | None = None) -> None:
-    """Print the full request being sent to OpenAI."""
+# Register the agent loop so spawn_agent can call it
+tools.set_agent_loop(run_sub_agent)
+
+
+def _print_request(model: str, messages: list, iteration: int, tool_schemas: list | None = None, start: int = 0) -> None:
+    """Print the request being sent to OpenAI.
+    Messages before `start` were already shown in an earlier iteration and are skipped,
+    so a whole loop renders each message once instead of once per iteration."""
     schemas = tool_schemas or tools.TOOL_SCHEMAS
-    print(f"\n{'='*60}")
-    print(f"  REQUEST TO OPENAI (iteration {iteration})")
-    print(f"  Model: {model}")
-    print(f"  Messages: {len(messages)}")
-    print(f"{'='*60}")
-    for i, msg in enumerate(messages):
+    buf = io.StringIO()
+    print(f"\n{'='*60}", file=buf)
+    print(f"  REQUEST TO OPENAI (iteration {iteration})", file=buf)
+    print(f"  Model: {model}", file=buf)
+    print(f"  Messages: {len(messages)}", file=buf)
+    print(f"{'='*60}", file=buf)
+    if start:
+        print(f"\n--- [0-{start - 1}] {start} prior messages already shown ---", file=buf)
+    for i, msg in enumerate(messages[start:], start):
         role = msg["role"]
-        print(f"\n--- [{i}] role: {role} ---")
+        print(f"\n--- [{i}] role: {role} ---", file=buf)
         if "content" in msg and msg["content"]:
             content = msg["content"]
+            if isinstance(content, list):
+                content = "".join(part.get("text", "") for part in content)
             if len(content) > 1000:
-                print(content[:1000] + f"... ({len(content)} chars)")
+                print(content[:1000] + f"... ({len(content)} chars)", file=buf)
             else:
-                print(content)
+                print(content, file=buf)
         if "tool_calls" in msg:
             for tc in msg["tool_calls"]:
                 fn = tc["function"]
-                print(f"  -> tool_call: {fn['name']}({fn['arguments']})")
+                print(f"  -> tool_call: {fn['name']}({fn['arguments']})", file=buf)
         if "tool_call_id" in msg:
-            print(f"  (tool_call_id: {msg['tool_call_id']})")
-    print(f"\n--- tools: {', '.join(t['function']['name'] for t in schemas)} ---")
-    print(f"{'='*60}\n")
+            print(f"  (tool_call_id: {msg['tool_call_id']})", file=buf)
+    print(f"\n--- tools: {', '.join(t['function']['name'] for t in schemas)} ---", file=buf)
+    print(f"{'='*60}\n", file=buf)
+    _emit(buf.getvalue())
 
 
 def _print_response(full_text: str, tool_call_list: list, iteration: int, thinking: str = "") -> None:
     """Pretty-print the response from OpenAI."""
-    print(f"\n{'*'*60}")
-    print(f"  RESPONSE FROM OPENAI (iteration {iteration})")
-    print(f"{'*'*60}")
+    buf = io.StringIO()
+    print(f"\n{'*'*60}", file=buf)
+    print(f"  RESPONSE FROM OPENAI (iteration {iteration})", file=buf)
+    print(f"{'*'*60}", file=buf)
 
     if thinking:
-        print(f"\n  💭 Thinking ({len(thinking)} chars):")
-        print(f"  ┌{'─'*56}┐")
+        print(f"\n  💭 Thinking ({len(thinking)} chars):", file=buf)
+        print(f"  ┌{'─'*56}┐", file=buf)
         for line in thinking.splitlines():
             if len(line) > 54:
                 line = line[:51] + "..."
-            print(f"  │ {line:<54} │")
-        print(f"  └{'─'*56}┘")
+            print(f"  │ {line:<54} │", file=buf)
+        print(f"  └{'─'*56}┘", file=buf)
 
     if full_text:
-        print(f"\n  ✦ Text ({len(full_text)} chars):")
-        print(f"  ┌{'─'*56}┐")
+        print(f"\n  ✦ Text ({len(full_text)} chars):", file=buf)
+        print(f"  ┌{'─'*56}┐", file=buf)
         for line in full_text.splitlines():
             if len(line) > 54:
                 line = line[:51] + "..."
-            print(f"  │ {line:<54} │")
-        print(f"  └{'─'*56}┘")
+            print(f"  │ {line:<54} │", file=buf)
+        print(f"  └{'─'*56}┘", file=buf)
     else:
-        print(f"\n  ✦ Text: (none)")
+        print(f"\n  ✦ Text: (none)", file=buf)
 
     if tool_call_list:
-        print(f"\n  ✦ Tool calls ({len(tool_call_list)}):")
+        print(f"\n  ✦ Tool calls ({len(tool_call_list)}):", file=buf)
         for i, tc in enumerate(tool_call_list):
             name = tc["function"]["name"]
-            args_raw = tc["function"]["arguments"]
-            try:
-                args = json.dumps(json.loads(args_raw), indent=2)
-            except (json.JSONDecodeError, TypeError):
-                args = args_raw
-            print(f"    [{i}] {name}()")
-            print(f"        id: {tc['id']}")
+            args = _format_args(tc)
+            print(f"    [{i}] {name}()", file=buf)
+            print(f"        id: {tc['id']}", file=buf)
             for arg_line in args.splitlines():
-                print(f"        {arg_line}")
+                print(f"        {arg_line}", file=buf)
     else:
-        print(f"\n  ✦ Tool calls: (none) — final response")
-
-    print(f"{'*'*60}\n")
+        print(f"\n  ✦ Tool calls: (none) — final response", file=buf)
+
+    print(f"{'*'*60}\n", file=buf)
+    _emit(buf.getvalue())
+
+
+def _parse_tool_args(args_raw: str) -> tuple[dict | None, str]:
+    """Parse a tool call's JSON arguments once, returning (args, error)."""
+    try:
+        args = jsonutil.loads(args_raw)
+    except (json.JSONDecodeError, TypeError) as e:
+        return None, f"invalid JSON arguments: {e}"
+    if not isinstance(args, dict):
+        return None, "arguments must be a JSON object"
+    return args, ""
+
+
+def _run_one_tool(tc: dict, handlers: dict | None) -> str:
+    """Run a single tool call, turning any exception into an error result for the model."""
+    if tc["args_error"]:
+        return f"Error: tool {tc['function']['name']} not run: {tc['args_error']}"
+    try:
+        # Arguments were already parsed (and validated) when the response came in
+        return tools.run_tool(tc["function"]["name"], tc["args"], handlers)
+    except Exception as e:
+        return f"Error: tool {tc['function']['name']} failed: {e}"
+
+
+def _run_tool_calls(tool_call_list: list, handlers: dict | None = None) -> list[str]:
+    """Run a batch of tool calls and return their results in call order.
+    Tools in tools.SERIAL_TOOLS are barriers: every earlier call finishes before one
+    runs (on the calling thread), and later calls start only after it. The runs of
+    independent calls between barriers fan out over a thread pool."""
+    workers = min(len(tool_call_list), TOOL_CONCURRENCY_LIMIT)
+    if workers <= 1:
+        return [_run_one_tool(tc, handlers) for tc in tool_call_list]
+
+    results: list[str] = [""] * len(tool_call_list)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: dict[int, object] = {}
+        for i, tc in enumerate(tool_call_list):
+            if tc["function"]["name"] not in tools.SERIAL_TOOLS:
+                pending[i] = pool.submit(_run_one_tool, tc, handlers)
+                continue
+            for j, future in pending.items():
+                results[j] = future.result()
+            pending.clear()
+            results[i] = _run_one_tool(tc, handlers)
+        for j, future in pending.items():
+            results[j] = future.result()
+    return results
+
+
+def _compact_tool_results(messages: list) -> None:
+    """Replace large tool results outside the recent window with a stub pointing at
+    get_tool_result, so the request doesn't grow by every tool output ever seen."""
+    tool_indexes = [i for i, m in enumerate(messages) if m["role"] == "tool"]
+    for i in tool_indexes[:-TOOL_RESULT_KEEP_RECENT]:
+        content = messages[i]["content"]
+        if len(content) <= TOOL_RESULT_INLINE_CHARS or content.startswith(_STUB_PREFIX):
+            continue
+        result_id = tools.store_tool_result(content)
+        stub = (
+            f"{_STUB_PREFIX} id={result_id}; {len(content)} chars — "
+            f"call get_tool_result to see all of it]\n"
+            f"{content[:TOOL_RESULT_PREVIEW_CHARS]}..."
+        )
+        messages[i] = {**messages[i], "content": stub}
 
 
-def run_agent_loop(client: OpenAI, model: str, messages: list, tool_schemas: list, max_iterations: int = 0) -> str:
+def _format_args(tc: dict) -> str:
+    """Render a tool call's arguments for display from the already-parsed args."""
+    if tc["args_error"]:
+        text = tc["function"]["arguments"] or ""
+    elif DEBUG_PRINT:
+        text = jsonutil.dumps_pretty(tc["args"])
+    else:
+        text = jsonutil.dumps(tc["args"])
+    if len(text) > PRETTY_ARGS_MAX_CHARS:
+        return text[:PRETTY_ARGS_MAX_CHARS] + f"... ({len(text)} chars)"
+    return text
+
+
+def run_agent_loop(
+    client: "OpenAI",
+    model: str,
+    messages: list,
+    tool_schemas: list,
+    max_iterations: int = 0,
+    use_cache: bool = False,
+    handlers: dict | None = None,
+) -> str:
     """Call the model in a loop, executing tool calls until it produces a final text reply.
-    If max_iterations > 0, stop after that many iterations even if the model wants more tool calls."""
+    If max_iterations > 0, stop after that many iterations even if the model wants more tool calls.
+    If use_cache is set, a final reply to an identical request is replayed from the response cache.
+    handlers, if given, is the tool dispatch table to use instead of tools.HANDLERS."""
+    can_compact = any(t["function"]["name"] == "get_tool_result" for t in tool_schemas)
+    tools_hash = cache.hash_tools(tool_schemas) if use_cache else ""
     iteration = 0
+    printed = 0  # messages already shown by _print_request
     while True:
         iteration += 1
-        _print_request(model, messages, iteration, tool_schemas)
+        if can_compact:
+            _compact_tool_results(messages)
+        _print_request(model, messages, iteration, tool_schemas, start=printed)
+        printed = len(messages)
+
+        cache_key = cache.make_key(model, messages, tools_hash) if use_cache else None
+        if cache_key:
+            hit = cache.get(cache_key)
+            if hit is not None:
+                _write(["[cache hit] replaying cached reply", hit["text"]])
+                return hit["text"]
 
         response = client.chat.completions.create(
             model=model,
@@ -138,26 +314,34 @@ def run_agent_loop(client: OpenAI, model: str, messages: list, tool_schemas: lis
         tool_call_list = []
         if msg.tool_calls:
             for tc in msg.tool_calls:
+                # Arguments are parsed once here; malformed JSON is reported back to
+                # the model without running the tool. The raw string is what gets echoed
+                # back in the assistant message.
+                args, args_error = _parse_tool_args(tc.function.arguments)
                 tool_call_list.append({
                     "id": tc.id,
                     "function": {
                         "name": tc.function.name,
                         "arguments": tc.function.arguments,
                     },
+                    "args": args,
+                    "args_error": args_error,
                 })
 
-        print('.'*60, flush=True)
-        print("LLM Response:", flush=True)
+        out = ['.'*60, "LLM Response:"]
         if thinking:
-            print(f"\n  💭 Thinking:\n{thinking}", flush=True)
+            out.append(f"\n  💭 Thinking:\n{thinking}")
         if full_text:
-            print(full_text, flush=True)
-        print('.'*60, '\n', flush=True)
+            out.append(full_text)
+        out.append('.'*60 + ' \n')
+        _write(out)
 
         _print_response(full_text, tool_call_list, iteration, thinking)
 
         # No tool calls — we're done
         if not tool_call_list:
+            if cache_key:
+                cache.put(cache_key, {"text": full_text})
             if full_text:
                 print()
             return full_text
@@ -177,23 +361,21 @@ def run_agent_loop(client: OpenAI, model: str, messages: list, tool_schemas: lis
             })
         messages.append(assistant_msg)
 
-        # Execute each tool and append results
-        for tc in tool_call_list:
-            name = tc["function"]["name"]
-            args_str = tc["function"]["arguments"]
-            print(f"\n[tool: {name}]", flush=True)
-
-            result = tools.run_tool(name, args_str)
-
+        # Execute the tools (concurrently where safe) and append results in call order
+        results = _run_tool_calls(tool_call_list, handlers)
+        out = []
+        for tc, result in zip(tool_call_list, results):
             # Show a preview of the result
             preview = result[:200] + "..." if len(result) > 200 else result
-            print(f"{preview}\n", flush=True)
+            out.append(f"\n[tool: {tc['function']['name']}]")
+            out.append(f"{preview}\n")
 
             messages.append({
                 "role": "tool",
                 "tool_call_id": tc["id"],
                 "content": result,
             })
+        _write(out)
 
         # Check iteration limit
         if max_iterations > 0 and iteration >= max_iterations:
@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".autocrew", "cache")
+
+
+def hash_tools(tool_schemas: list) -> str:
+    """Hash tool schemas once so make_key doesn't re-serialize them every iteration."""
+    return hashlib.sha256(json.dumps(tool_schemas, sort_keys=True).encode()).hexdigest()
+
+
+def make_key(model: str, messages: list, tools_hash: str = "", namespace: str = "") -> str:
+    """Return a stable hash of everything that determines a model response.
+
+    namespace separates callers whose requests could otherwise collide (e.g. "plan_roster").
+    """
+    key = {"model": model, "messages": messages, "tools": tools_hash}
+    if namespace:
+        key["namespace"] = namespace
+    payload = json.dumps(key, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _path(key: str) -> str:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def get(key: str, max_age: float | None = None) -> dict | None:
+    """Return the cached value, or None if missing, unreadable, or older than max_age seconds."""
+    path = _path(key)
+    try:
+        if max_age is not None and time.time() - os.stat(path).st_mtime > max_age:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def put(key: str, value: dict) -> None:
+    # Write to a temp file and rename so a crash never leaves a partial entry
+    path = _path(key)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(value, f)
+    os.replace(tmp, path)
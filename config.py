@@ -1,3 +1,4 @@
+import functools
 import json
 import os
 
@@ -7,12 +8,28 @@ CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 DEFAULTS = {
     "model": "gpt-5.2",
     "system_prompt": "You are AutoCrew, a helpful AI assistant.",
+    # Replay identical requests (same model, messages, and tools) from ~/.autocrew/cache
+    "cache_enabled": False,
+    # Run team agents that were handed work in the same turn concurrently
+    "parallel_turns": False,
+    # Reuse a planned team roster for the same task and model for this many hours (0 = off)
+    "plan_cache_hours": 0,
 }
 
 
 def load() -> dict:
     os.makedirs(CONFIG_DIR, exist_ok=True)
-    if os.path.exists(CONFIG_FILE):
+    # Key the cache on the file's mtime so edits to config.json are still picked up
+    try:
+        mtime_ns = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+    return dict(_load_cached(mtime_ns))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_cached(mtime_ns: int | None) -> dict:
+    if mtime_ns is not None:
         with open(CONFIG_FILE) as f:
             return {**DEFAULTS, **json.load(f)}
     return dict(DEFAULTS)
@@ -0,0 +1,117 @@
+"""Cache of extracted web_fetch / pdf_fetch text: an in-memory LRU over a SQLite file,
+revalidated with ETag / Last-Modified."""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import cache
+
+FETCH_CACHE_FILE = os.path.join(cache.CACHE_DIR, "fetch.sqlite")
+# Within this many seconds of a fetch the cached text is returned without any request;
+# after that it is revalidated with a conditional GET
+FETCH_CACHE_TTL = int(os.environ.get("AUTOCREW_FETCH_CACHE_TTL", "300"))
+MEMORY_ENTRIES = 128
+# 0 keeps the cache in memory only, so nothing is written to FETCH_CACHE_FILE
+FETCH_CACHE_PERSIST = os.environ.get("AUTOCREW_FETCH_CACHE_PERSIST", "1") == "1"
+# The SQLite file keeps only this many of the most recently fetched entries
+FETCH_CACHE_MAX_ROWS = int(os.environ.get("AUTOCREW_FETCH_CACHE_MAX_ROWS", "1000"))
+
+_memory: OrderedDict[str, dict] = OrderedDict()
+_lock = threading.Lock()  # guards _memory and the shared connection
+_conn: sqlite3.Connection | None = None
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        os.makedirs(cache.CACHE_DIR, exist_ok=True)
+        _conn = sqlite3.connect(FETCH_CACHE_FILE, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS fetch ("
+            "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, text TEXT, fetched_at REAL)"
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS fetch_fetched_at ON fetch (fetched_at)")
+    return _conn
+
+
+def _remember(key: str, entry: dict) -> None:
+    _memory[key] = entry
+    _memory.move_to_end(key)
+    if len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def get(key: str) -> dict | None:
+    """Return {etag, last_modified, text, fetched_at} for key, or None."""
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+            return entry
+        if not FETCH_CACHE_PERSIST:
+            return None
+        try:
+            row = _db().execute(
+                "SELECT etag, last_modified, text, fetched_at FROM fetch WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        entry = dict(zip(("etag", "last_modified", "text", "fetched_at"), row))
+        _remember(key, entry)
+        return entry
+
+
+def is_fresh(entry: dict) -> bool:
+    return time.time() - entry["fetched_at"] < FETCH_CACHE_TTL
+
+
+def validators(entry: dict | None) -> dict:
+    """Conditional-request headers for a cached entry."""
+    headers = {}
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def put(key: str, response_headers, text: str) -> None:
+    """Store text with the validators from the response that produced it."""
+    _store(key, {
+        "etag": response_headers.get("ETag"),
+        "last_modified": response_headers.get("Last-Modified"),
+        "text": text,
+        "fetched_at": time.time(),
+    })
+
+
+def touch(key: str, entry: dict) -> None:
+    """Mark a cached entry fresh again after a 304 Not Modified."""
+    _store(key, {**entry, "fetched_at": time.time()})
+
+
+def _store(key: str, entry: dict) -> None:
+    with _lock:
+        _remember(key, entry)
+        if not FETCH_CACHE_PERSIST:
+            return
+        try:
+            with _db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fetch VALUES (?, ?, ?, ?, ?)",
+                    (key, entry["etag"], entry["last_modified"], entry["text"], entry["fetched_at"]),
+                )
+                # Evict the least recently fetched rows so the file stays bounded
+                conn.execute(
+                    "DELETE FROM fetch WHERE key NOT IN "
+                    "(SELECT key FROM fetch ORDER BY fetched_at DESC LIMIT ?)",
+                    (FETCH_CACHE_MAX_ROWS,),
+                )
+        except sqlite3.Error:
+            pass  # the in-memory copy still serves this run
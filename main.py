@@ -5,7 +5,6 @@ import sys
 
 import agent
 import session
-import team
 
 
 COMMANDS = {
@@ -66,6 +65,8 @@ def main():
                 print("Usage: /team <task description>")
                 continue
             try:
+                import team  # deferred: only team runs need it
+
                 run = team.TeamRun(task)
                 summary = run.run()
                 session.append("user", f"/team {task}")
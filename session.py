@@ -1,34 +1,93 @@
-import json
+import atexit
 import os
+import queue
+import sys
+import threading
+from typing import TextIO
+
+import jsonutil
 
 SESSION_DIR = os.path.join(os.path.expanduser("~"), ".autocrew", "sessions")
 DEFAULT_SESSION = os.path.join(SESSION_DIR, "default.jsonl")
 
+# Appends are queued and written by a single background thread (FIFO, so order is
+# preserved). The append handle is only touched by that thread, or after flush().
+_queue: queue.Queue = queue.Queue()
+_worker: threading.Thread | None = None
+_worker_lock = threading.Lock()
+_fh: TextIO | None = None
+
 
 def _path() -> str:
     os.makedirs(SESSION_DIR, exist_ok=True)
     return DEFAULT_SESSION
 
 
+def _write_batch(entries: list[dict]) -> None:
+    global _fh
+    if _fh is None:
+        _fh = open(_path(), "a", buffering=1, encoding="utf-8")
+    _fh.write("".join(jsonutil.dumps(e) + "\n" for e in entries))
+
+
+def _drain() -> None:
+    while True:
+        batch = [_queue.get()]
+        while True:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _write_batch(batch)
+        except Exception as e:
+            print(f"Session write error: {e}", file=sys.stderr)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _ensure_worker() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_drain, name="session-writer", daemon=True)
+            _worker.start()
+
+
+def flush() -> None:
+    """Block until every queued append is on disk."""
+    _queue.join()
+
+
+def _close() -> None:
+    global _fh
+    flush()
+    if _fh is not None:
+        _fh.close()
+        _fh = None
+
+
+atexit.register(_close)
+
+
 def load() -> list[dict]:
+    flush()
     path = _path()
     if not os.path.exists(path):
         return []
-    turns = []
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                turns.append(json.loads(line))
-    return turns
+    with open(path, encoding="utf-8") as f:
+        return [jsonutil.loads(line) for line in f.read().splitlines() if line.strip()]
 
 
 def append(role: str, content: str) -> None:
-    with open(_path(), "a") as f:
-        f.write(json.dumps({"role": role, "content": content}) + "\n")
+    """Queue a turn for writing and return immediately."""
+    _ensure_worker()
+    _queue.put({"role": role, "content": content})
 
 
 def clear() -> None:
+    _close()
     path = _path()
     if os.path.exists(path):
         os.remove(path)
@@ -1,3 +1,4 @@
+import functools
 import glob
 import os
 import re
@@ -6,30 +7,80 @@ SKILLS_DIR = os.path.join(os.path.dirname(__file__), "skills")
 
 _FRONTMATTER_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n", re.DOTALL)
 
+# Frontmatter sits at the top of SKILL.md, so the body is usually never read
+FRONTMATTER_READ_BYTES = 2048
 
-def _parse_frontmatter(text: str) -> dict:
-    """Extract name and description from YAML frontmatter (simple parser, no PyYAML needed)."""
-    m = _FRONTMATTER_RE.match(text)
-    if not m:
-        return {}
+
+def _parse_frontmatter_lines(block: str) -> dict:
     result = {}
-    for line in m.group(1).splitlines():
+    for line in block.splitlines():
         for key in ("name", "description"):
             if line.startswith(f"{key}:"):
                 result[key] = line[len(key) + 1:].strip()
     return result
 
 
+def _parse_frontmatter(text: str) -> dict:
+    """Extract name and description from YAML frontmatter (simple parser, no PyYAML needed)."""
+    m = _FRONTMATTER_RE.match(text)
+    if not m:
+        return {}
+    return _parse_frontmatter_lines(m.group(1))
+
+
+def _scan_frontmatter(head: bytes) -> dict | None:
+    """Scan the frontmatter block at the start of head with plain byte finds,
+    decoding only the block itself. Returns None if the closing '---' is not
+    within head (the caller reads more)."""
+    if not head.startswith(b"---"):
+        return {}
+    first_nl = head.find(b"\n")
+    if first_nl == -1:
+        return None
+    if head[3:first_nl].strip():
+        return {}
+    start = first_nl + 1
+    pos = first_nl
+    while True:
+        pos = head.find(b"\n---", pos)
+        if pos == -1:
+            return None
+        line_end = head.find(b"\n", pos + 4)
+        if line_end == -1:
+            return None
+        if not head[pos + 4:line_end].strip():
+            return _parse_frontmatter_lines(head[start:pos].decode("utf-8", errors="replace"))
+        pos = line_end
+
+
+def _read_frontmatter(path: str) -> dict:
+    with open(path, "rb") as f:
+        head = f.read(FRONTMATTER_READ_BYTES)
+        meta = _scan_frontmatter(head)
+        if meta is None:
+            # Frontmatter longer than the head chunk: read the rest and use the regex
+            meta = _parse_frontmatter((head + f.read()).decode("utf-8", errors="replace"))
+    return meta
+
+
 def list_skills() -> list[dict]:
     """Return list of {'name': ..., 'description': ...} for all discovered skills."""
+    # Adding or removing a skill directory bumps SKILLS_DIR's mtime, invalidating the cache
+    try:
+        mtime_ns = os.stat(SKILLS_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    return list(_list_skills_cached(mtime_ns))
+
+
+@functools.lru_cache(maxsize=1)
+def _list_skills_cached(mtime_ns: int) -> list[dict]:
     skills = []
     for path in sorted(glob.glob(os.path.join(SKILLS_DIR, "*", "SKILL.md"))):
         try:
-            with open(path) as f:
-                text = f.read()
+            meta = _read_frontmatter(path)
         except OSError:
             continue
-        meta = _parse_frontmatter(text)
         if "name" in meta:
             skills.append({
                 "name": meta["name"],
@@ -42,9 +93,16 @@ def load_skill(name: str) -> str:
     """Return the full SKILL.md content for the given skill name, with {baseDir} resolved."""
     skill_dir = os.path.join(SKILLS_DIR, name)
     path = os.path.join(skill_dir, "SKILL.md")
+    # Keyed on the file's mtime so edits to a SKILL.md are picked up on the next call
     try:
-        with open(path) as f:
-            content = f.read()
-        return content.replace("{baseDir}", skill_dir)
+        mtime_ns = os.stat(path).st_mtime_ns
+        return _load_skill_cached(skill_dir, path, mtime_ns)
     except FileNotFoundError:
         return f"Error: skill not found: {name}"
+
+
+@functools.lru_cache(maxsize=64)
+def _load_skill_cached(skill_dir: str, path: str, mtime_ns: int) -> str:
+    with open(path) as f:
+        content = f.read()
+    return content.replace("{baseDir}", skill_dir)
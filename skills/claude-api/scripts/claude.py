@@ -8,12 +8,19 @@ from __future__ import annotations
 import argparse
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 
 def eprint(msg: str) -> None:
     print(msg, file=sys.stderr)
 
 
+def read_context_file(path: str) -> str:
+    # One binary read (sized from fstat by the io layer) and a single decode pass
+    with open(path, "rb") as fh:
+        return fh.read().decode("utf-8", errors="replace")
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Call the Anthropic Claude API for text generation and analysis."
@@ -59,25 +66,34 @@ def main() -> int:
         eprint("Install it with: pip install anthropic")
         return 2
 
-    # Build prompt with optional file contexts
-    parts: list[str] = []
-    for path in args.files or []:
-        try:
-            with open(path, "r", encoding="utf-8", errors="replace") as fh:
-                content = fh.read()
-        except OSError as exc:
-            eprint(f"Error reading file '{path}': {exc}")
-            return 2
-        parts.append(f"```{path}\n{content}\n```")
-
-    parts.append(args.prompt)
-    full_prompt = "\n\n".join(parts)
+    # Build prompt with optional file contexts. Files go first as separate blocks,
+    # with a cache breakpoint on the last one, so repeat calls over the same files
+    # reuse Anthropic's prompt cache and only the trailing prompt is new input.
+    content: list[dict] = []
+    paths = args.files or []
+    if paths:
+        # Read all files concurrently; results come back in input order
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+            futures = [pool.submit(read_context_file, path) for path in paths]
+            for path, future in zip(paths, futures):
+                try:
+                    file_text = future.result()
+                except OSError as exc:
+                    eprint(f"Error reading file '{path}': {exc}")
+                    for f in futures:
+                        f.cancel()
+                    return 2
+                content.append({"type": "text", "text": f"```{path}\n{file_text}\n```"})
+    if content:
+        content[-1]["cache_control"] = {"type": "ephemeral"}
+
+    content.append({"type": "text", "text": args.prompt})
 
     # Build message params
     create_kwargs: dict = {
         "model": args.model,
         "max_tokens": args.max_tokens,
-        "messages": [{"role": "user", "content": full_prompt}],
+        "messages": [{"role": "user", "content": content}],
     }
     if args.system:
         create_kwargs["system"] = args.system
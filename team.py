@@ -1,17 +1,26 @@
 """Multi-agent team runner."""
 
+import heapq
+import itertools
 import json
 import os
+import secrets
+import threading
 import time
-import uuid
-
-from openai import OpenAI
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
+import cache
 import config
+import jsonutil
 import skills
 import tools
 from agent import run_agent_loop
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 # Tools available for assignment to agents (team tools are always added separately)
 ASSIGNABLE_TOOLS = [s["function"]["name"] for s in tools.TOOL_SCHEMAS]
 # Team tools that are always given to every agent
@@ -19,6 +28,11 @@ MANDATORY_TEAM_TOOLS = ["post_message", "read_messages", "read_artifacts"]
 
 TEAMS_DIR = os.path.join(os.path.expanduser("~"), ".autocrew", "teams")
 
+# Rolling window of board messages kept in memory, overall and per recipient
+RECENT_MESSAGES_MAXLEN = 4096
+# Once messages.jsonl holds this many lines beyond the window, it is rewritten to the window
+MESSAGE_LOG_COMPACT_SLACK = 1024
+
 # --- Team tool schemas (not added to global tools.TOOL_SCHEMAS) ---
 
 TEAM_TOOL_SCHEMAS = [
@@ -92,77 +106,152 @@ TEAM_TOOL_SCHEMAS = [
 ]
 
 TEAM_TOOL_NAMES = {s["function"]["name"] for s in TEAM_TOOL_SCHEMAS}
+# Name -> schema, so per-agent filtering is a lookup per allowed tool
+TOOL_SCHEMA_BY_NAME = {s["function"]["name"]: s for s in tools.TOOL_SCHEMAS}
+TEAM_TOOL_SCHEMA_BY_NAME = {s["function"]["name"]: s for s in TEAM_TOOL_SCHEMAS}
+
+
+def _system_message(system_prompt: str, model: str) -> dict:
+    """Build the system message. Claude models get an explicit prompt-cache breakpoint;
+    OpenAI models cache the stable prefix automatically."""
+    if model.startswith("claude"):
+        return {
+            "role": "system",
+            "content": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+        }
+    return {"role": "system", "content": system_prompt}
 
 
 class TeamRun:
     def __init__(self, task: str):
         self.task = task
-        self.run_id = uuid.uuid4().hex[:12]
+        self.run_id = secrets.token_hex(6)
         self.workspace = os.path.join(TEAMS_DIR, self.run_id)
         self.messages_file = os.path.join(self.workspace, "messages.jsonl")
         self.artifacts_dir = os.path.join(self.workspace, "artifacts")
         self.done = False
         self.done_summary = ""
         self.roster: list[dict] = []
-        self.agent_histories: dict[str, list] = {}
+        # Roster indexes, built once in plan_roster
+        self._resolve_order: list[dict] = []
+        self._agents_by_id: dict[str, dict] = {}
+        self._agents_by_role: dict[str, list[dict]] = {}
+        # Roster is final after plan_roster, so each agent's system prompt is built once
+        self._roster_text: str = ""
+        self._system_prompts: dict[str, str] = {}
+        # agent_id -> (tool_schemas, allowed tool names); handlers are still bound per turn
+        self._agent_schemas: dict[str, tuple[list[dict], set[str]]] = {}
+        # Skills are listed once per run, for plan_roster and every agent's system prompt
+        self._skill_list: list[dict] = skills.list_skills()
+        self._skill_names: list[str] = [s["name"] for s in self._skill_list]
+        # In-memory view of messages.jsonl; the file is written for durability but never re-read.
+        # Both structures hold the same entry objects, each list in posting (= ts) order.
+        self._recent: deque[dict] = deque(maxlen=RECENT_MESSAGES_MAXLEN)
+        self._msgs_by_recipient: dict[str, deque[dict]] = defaultdict(
+            lambda: deque(maxlen=RECENT_MESSAGES_MAXLEN)
+        )
+        self._log_lines = 0  # lines in messages.jsonl, including buffered ones
+        self._pending_writes: list[bytes] = []  # log lines buffered until the turn ends
+        # ({dir: mtime_ns} for every artifacts dir, rendered listing)
+        self._artifacts_cache: tuple[dict[str, int], str] | None = None
+        # Per-agent conversation, trimmed to the last 3 turns (user + assistant each)
+        self.agent_histories: dict[str, deque] = {}
         self._pending_agents: list[str] = []  # queue of resolved agent_ids to activate
         self._current_agent: str = ""
         self._consecutive_fallbacks: int = 0
+        # Guards the board and activation queue when agent turns run concurrently
+        self._lock = threading.RLock()
 
         os.makedirs(self.artifacts_dir, exist_ok=True)
-        # Create empty messages file
-        open(self.messages_file, "w").close()
+        # Create the messages file and keep it open for the whole run
+        self._msg_fp = open(self.messages_file, "wb")
 
     # --- Message board ---
 
     def post_message(self, from_agent: str, to: str, content: str) -> str:
+        with self._lock:
+            return self._post_message(from_agent, to, content)
+
+    def _post_message(self, from_agent: str, to: str, content: str) -> str:
         entry = {
             "ts": time.time(),
             "from": from_agent,
             "to": to,
             "content": content,
         }
-        with open(self.messages_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+        self._pending_writes.append(jsonutil.dumpb(entry) + b"\n")
+        self._log_lines += 1
+        self._recent.append(entry)
+        self._msgs_by_recipient[to].append(entry)
+        if self._log_lines >= RECENT_MESSAGES_MAXLEN + MESSAGE_LOG_COMPACT_SLACK:
+            self._compact_log()
         # Resolve recipient to an agent_id and enqueue if not already pending
         resolved = self._resolve_recipient(to)
+        lines = []
         if resolved and resolved not in self._pending_agents:
-            print(f"enqueueing agent: {resolved}, to: {to}", flush=True)
+            lines.append(f"enqueueing agent: {resolved}, to: {to}")
             self._pending_agents.append(resolved)
-        print(f"pending agents: {self._pending_agents}", flush=True)
+        lines.append(f"pending agents: {self._pending_agents}")
+        print("\n".join(lines), flush=True)
         return "Message posted."
 
+    def _compact_log(self) -> None:
+        """Rewrite messages.jsonl to just the in-memory window (atomically via rename)."""
+        tmp = self.messages_file + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"".join(jsonutil.dumpb(m) + b"\n" for m in self._recent))
+        self._msg_fp.close()
+        os.replace(tmp, self.messages_file)
+        self._msg_fp = open(self.messages_file, "ab")
+        self._log_lines = len(self._recent)
+        self._pending_writes.clear()  # the window already includes them
+
+    def _flush_log(self) -> None:
+        """Write all buffered board messages to messages.jsonl in one call."""
+        with self._lock:
+            if self._pending_writes:
+                self._msg_fp.write(b"".join(self._pending_writes))
+                self._pending_writes.clear()
+                self._msg_fp.flush()
+
+    def close(self) -> None:
+        """Flush and close the message log."""
+        if not self._msg_fp.closed:
+            self._flush_log()
+            self._msg_fp.close()
+
     def read_messages(self, for_agent: str, last_n: int = 20) -> str:
-        all_msgs = []
-        with open(self.messages_file) as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    all_msgs.append(json.loads(line))
-
-        # Find the role for this agent
-        agent_role = None
-        for a in self.roster:
-            if a["agent_id"] == for_agent:
-                agent_role = a["role"]
-                break
+        with self._lock:
+            return self._read_messages(for_agent, last_n)
 
-        # Filter: last N global + all addressed to this agent
-        global_recent = all_msgs[-last_n:] if len(all_msgs) > last_n else all_msgs
+    def _read_messages(self, for_agent: str, last_n: int) -> str:
+        agent_role = self._agents_by_id[for_agent]["role"] if for_agent in self._agents_by_id else None
+
+        # Last N global messages (taken from the deque's tail) + all addressed to this agent
+        global_recent = list(itertools.islice(reversed(self._recent), max(last_n, 0)))
+        global_recent.reverse()
+        recipients = {for_agent, agent_role, "all"} - {None}
         addressed = [
-            m for m in all_msgs
-            if m["to"] in (for_agent, agent_role, "all")
+            self._msgs_by_recipient[r]
+            for r in recipients
+            if self._msgs_by_recipient.get(r)
         ]
 
-        # Deduplicate and sort by timestamp
-        seen = set()
-        combined = []
-        for m in global_recent + addressed:
-            key = (m["ts"], m["from"], m["content"])
-            if key not in seen:
-                seen.add(key)
-                combined.append(m)
-        combined.sort(key=lambda m: m["ts"])
+        # Common case: every addressed message is newer than the start of the tail, so
+        # the tail already contains them all. Ties on ts are ambiguous and take the merge.
+        if not addressed or (
+            global_recent and all(q[0]["ts"] > global_recent[0]["ts"] for q in addressed)
+        ):
+            combined = global_recent
+        else:
+            # Every source is already in ts order, so merge instead of sorting; entries
+            # are shared objects, so identity is enough to drop duplicates
+            seen = set()
+            combined = []
+            for m in heapq.merge(global_recent, *addressed, key=lambda m: m["ts"]):
+                if id(m) not in seen:
+                    seen.add(id(m))
+                    combined.append(m)
 
         if not combined:
             return "(no messages yet)"
@@ -172,32 +261,64 @@ class TeamRun:
             lines.append(f"[{m['from']} → {m['to']}]: {m['content']}")
         return "\n".join(lines)
 
+    def _artifacts_unchanged(self) -> bool:
+        """A directory's mtime changes whenever an entry is added, removed, or renamed
+        in it, so the cached listing is valid while every known directory's is unchanged."""
+        if self._artifacts_cache is None:
+            return False
+        mtimes = self._artifacts_cache[0]
+        try:
+            return all(os.stat(d).st_mtime_ns == m for d, m in mtimes.items())
+        except OSError:
+            return False
+
     def read_artifacts(self) -> str:
+        with self._lock:
+            return self._read_artifacts()
+
+    def _read_artifacts(self) -> str:
+        if self._artifacts_unchanged():
+            return self._artifacts_cache[1]
+
+        # Iterative DFS; each directory is stat'ed before it is listed, so a change
+        # made while listing is caught by the next call
         files = []
-        for root, _, filenames in os.walk(self.artifacts_dir):
-            for fname in filenames:
-                full = os.path.join(root, fname)
-                rel = os.path.relpath(full, self.artifacts_dir)
-                files.append(rel)
+        mtimes = {}
+        stack = [(self.artifacts_dir, "")]
+        while stack:
+            path, prefix = stack.pop()
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, prefix + entry.name + os.sep))
+                        elif entry.is_file():
+                            files.append(prefix + entry.name)
+            except OSError:
+                continue
         if not files:
-            return "(no artifacts yet)"
-        return "Artifacts:\n" + "\n".join(f"- {f}" for f in sorted(files))
+            listing = "(no artifacts yet)"
+        else:
+            listing = "Artifacts:\n" + "\n".join(f"- {f}" for f in sorted(files))
+        self._artifacts_cache = (mtimes, listing)
+        return listing
 
     def declare_done(self, summary: str) -> str:
         self.done = True
         self.done_summary = summary
+        self._flush_log()
         return "Team run marked as done."
 
     # --- Meta-orchestrator: plan the roster ---
 
-    def plan_roster(self, client: OpenAI, model: str) -> list[dict]:
+    def plan_roster(self, client: "OpenAI", model: str, cache_hours: float = 0) -> list[dict]:
         tools_list = ", ".join(ASSIGNABLE_TOOLS)
-        skill_names = [s["name"] for s in skills.list_skills()]
         skills_section = ""
-        if skill_names:
+        if self._skill_names:
             skills_section = (
                 "\n\nAvailable skills (give agents 'use_skill' tool to access these):\n"
-                + ", ".join(skill_names)
+                + ", ".join(self._skill_names)
             )
 
         prompt = (
@@ -232,15 +353,25 @@ class TeamRun:
         )
 
         print(f"\n[team] Planning roster for: {self.task}", flush=True)
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-        )
-
-        raw = response.choices[0].message.content
+        messages = [{"role": "user", "content": prompt}]
+        # The prompt carries the task, tool list, and skills, so key on it rather than the task alone
+        cache_key = cache.make_key(model, messages, namespace="plan_roster") if cache_hours > 0 else None
+        hit = cache.get(cache_key, max_age=cache_hours * 3600) if cache_key else None
+        if hit is not None:
+            print("[team] Reusing cached roster", flush=True)
+            raw = hit["text"]
+        else:
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+            )
+            raw = response.choices[0].message.content
         data = json.loads(raw)
         roster_spec = data.get("roster", [])
+        # Only a response that parsed into a usable roster is worth replaying
+        if hit is None and cache_key and roster_spec:
+            cache.put(cache_key, {"text": raw})
 
         # Build the valid tool name set for validation
         valid_tools = set(ASSIGNABLE_TOOLS) | TEAM_TOOL_NAMES
@@ -300,29 +431,46 @@ class TeamRun:
         agents = filtered[:6]
 
         self.roster = agents
+        # Resolution order: non-orchestrators first, orchestrator last
+        self._resolve_order = [a for a in agents if a["role"] != "orchestrator"] + [
+            a for a in agents if a["role"] == "orchestrator"
+        ]
+        self._agents_by_id = {a["agent_id"]: a for a in self._resolve_order}
+        self._agents_by_role = {}
+        for a in self._resolve_order:
+            self._agents_by_role.setdefault(a["role"], []).append(a)
+        self._roster_text = "\n".join(
+            f"- {a['agent_id']} ({a['role']}): {a['focus']}" for a in agents
+        )
+        self._system_prompts = {a["agent_id"]: self.build_system_prompt(a) for a in agents}
+        self._agent_schemas = {a["agent_id"]: self._filter_tool_schemas(a) for a in agents}
 
-        print(f"[team] Roster ({len(agents)} agents):", flush=True)
+        lines = [f"[team] Roster ({len(agents)} agents):"]
         for a in agents:
             agent_tools_str = ", ".join(
                 t for t in a["allowed_tools"] if t not in MANDATORY_TEAM_TOOLS
             )
-            print(f"  - {a['agent_id']}: {a['focus']} [tools: {agent_tools_str}]", flush=True)
+            lines.append(f"  - {a['agent_id']}: {a['focus']} [tools: {agent_tools_str}]")
+        print("\n".join(lines), flush=True)
 
         return agents
 
     # --- Build tools for an agent ---
 
+    def _filter_tool_schemas(self, agent_entry: dict) -> tuple[list[dict], set[str]]:
+        """Return (tool_schemas, allowed_names) for an agent; fixed once the roster is."""
+        # Ordered de-dup: schema order follows allowed_tools, so it's stable across runs
+        names = list(dict.fromkeys(agent_entry["allowed_tools"]))
+        schemas = [TOOL_SCHEMA_BY_NAME[n] for n in names if n in TOOL_SCHEMA_BY_NAME]
+        schemas += [TEAM_TOOL_SCHEMA_BY_NAME[n] for n in names if n in TEAM_TOOL_SCHEMA_BY_NAME]
+        return schemas, set(names)
+
     def build_agent_tools(self, agent_id: str, agent_entry: dict) -> tuple[list[dict], dict]:
         """Return (tool_schemas, handler_overrides) for one agent turn."""
-        allowed = set(agent_entry["allowed_tools"])
-
-        # Filter global tool schemas
-        schemas = [s for s in tools.TOOL_SCHEMAS if s["function"]["name"] in allowed]
-
-        # Filter and add team tool schemas
-        for s in TEAM_TOOL_SCHEMAS:
-            if s["function"]["name"] in allowed:
-                schemas.append(s)
+        cached = self._agent_schemas.get(agent_id)
+        if cached is None:
+            cached = self._agent_schemas[agent_id] = self._filter_tool_schemas(agent_entry)
+        schemas, allowed = cached
 
         # Build team handlers that capture agent_id
         handler_overrides = {}
@@ -344,14 +492,11 @@ class TeamRun:
     # --- Build system prompt for an agent ---
 
     def build_system_prompt(self, agent_entry: dict) -> str:
-        roster_text = "\n".join(
-            f"- {a['agent_id']} ({a['role']}): {a['focus']}" for a in self.roster
-        )
         prompt = (
             f"{agent_entry['system_prompt']}\n\n"
             f"You are {agent_entry['agent_id']} (role: {agent_entry['role']}).\n"
             f"Your focus: {agent_entry['focus']}\n\n"
-            f"Team roster:\n{roster_text}\n\n"
+            f"Team roster:\n{self._roster_text}\n\n"
             f"Artifacts directory: {self.artifacts_dir}\n\n"
             f"IMPORTANT: When you post_message to an agent, that agent will be activated "
             f"automatically after your turn ends. Do NOT poll read_messages waiting for a "
@@ -361,7 +506,7 @@ class TeamRun:
 
         # Add skill info if agent has use_skill
         if "use_skill" in agent_entry["allowed_tools"]:
-            skill_list = skills.list_skills()
+            skill_list = self._skill_list
             if skill_list:
                 lines = ["\n\n## Available Skills\n"]
                 lines.append("Call the `use_skill` tool with the skill name to load its full instructions before performing it.\n")
@@ -375,21 +520,12 @@ class TeamRun:
 
     def _resolve_recipient(self, to: str) -> str | None:
         """Resolve a post_message 'to' value to a concrete agent_id."""
-        # Roster order: non-orchestrators first, orchestrator last
-        non_orch = [a for a in self.roster if a["role"] != "orchestrator"]
-        orch = [a for a in self.roster if a["role"] == "orchestrator"]
-        agent_order = non_orch + orch
-
         # Exact agent_id match
-        for a in agent_order:
-            if a["agent_id"] == to:
-                return to
-
-        # Role name match — return first agent of that role
-        for a in agent_order:
-            if a["role"] == to:
-                return a["agent_id"]
-
+        if to in self._agents_by_id:
+            return to
+        # Role name match — first agent of that role in resolution order
+        if to in self._agents_by_role:
+            return self._agents_by_role[to][0]["agent_id"]
         return None
 
     def _pop_next_agent(self) -> str | None:
@@ -401,97 +537,72 @@ class TeamRun:
     # --- Main runner ---
 
     def run(self) -> str:
+        try:
+            return self._run()
+        finally:
+            self.close()
+
+    def _run(self) -> str:
+        from openai import OpenAI
+
         cfg = config.load()
         client = OpenAI()
         model = cfg["model"]
+        parallel = cfg["parallel_turns"]
 
         # Step 1: Plan roster
-        self.plan_roster(client, model)
+        self.plan_roster(client, model, cfg["plan_cache_hours"])
 
         # Step 2: Post initial task
         self.post_message("system", "all", f"TASK: {self.task}")
 
         # Step 3: Find orchestrator — it always kicks things off
-        orch_id = None
-        for a in self.roster:
-            if a["role"] == "orchestrator":
-                orch_id = a["agent_id"]
-                break
-        next_agent = orch_id
+        orch_id = self._agents_by_role.get("orchestrator", [{}])[0].get("agent_id")
+        next_agents = [orch_id] if orch_id else []
 
         max_turns = 30
         turn_count = 0
 
-        while next_agent and turn_count < max_turns and not self.done:
-            turn_count += 1
-            self._current_agent = next_agent
-
-            # Find agent entry
-            agent_entry = None
-            for a in self.roster:
-                if a["agent_id"] == next_agent:
-                    agent_entry = a
-                    break
-            if not agent_entry:
+        while next_agents and turn_count < max_turns and not self.done:
+            batch = next_agents[:max_turns - turn_count]
+            if any(agent_id not in self._agents_by_id for agent_id in batch):
                 break
 
-            print(f"\n{'='*60}", flush=True)
-            print(f"  TURN {turn_count}/{max_turns} — {next_agent}", flush=True)
-            print(f"  remaining agents: {self._pending_agents}", flush=True)
-            print(f"{'='*60}", flush=True)
-
-            # Build tools and handlers
-            schemas, handler_overrides = self.build_agent_tools(next_agent, agent_entry)
-
-            # Temporarily inject team handlers
-            original_handlers = {}
-            for name, handler in handler_overrides.items():
-                original_handlers[name] = tools.HANDLERS.get(name)
-                tools.HANDLERS[name] = handler
-
-            try:
-                # Build messages
-                system_prompt = self.build_system_prompt(agent_entry)
-                history = self.agent_histories.get(next_agent, [])
-
-                board_snapshot = self.read_messages(next_agent, last_n=20)
-                user_msg = (
-                    f"Turn {turn_count}. Continue working on your tasks.\n\n"
-                    f"Current message board:\n{board_snapshot}"
-                )
-
-                messages = [{"role": "system", "content": system_prompt}]
-                messages.extend(history)
-                messages.append({"role": "user", "content": user_msg})
-
-                # Run agent loop (cap iterations so agents yield their turn)
-                reply = run_agent_loop(client, model, messages, schemas, max_iterations=16)
-
-                # Save to per-agent history (trimmed)
-                history.append({"role": "user", "content": user_msg})
-                history.append({"role": "assistant", "content": reply})
-                if len(history) > 6:
-                    history = history[-6:]
-                self.agent_histories[next_agent] = history
-
-            finally:
-                for name, orig in original_handlers.items():
-                    if orig is None:
-                        tools.HANDLERS.pop(name, None)
-                    else:
-                        tools.HANDLERS[name] = orig
+            if len(batch) == 1:
+                turn_count += 1
+                self._run_turn(client, model, batch[0], turn_count, max_turns)
+            else:
+                # Agents handed work in the same turn run side by side, one turn each
+                with ThreadPoolExecutor(max_workers=len(batch)) as pool:
+                    futures = [
+                        pool.submit(self._run_turn, client, model, agent_id, turn_count + i + 1, max_turns)
+                        for i, agent_id in enumerate(batch)
+                    ]
+                    for future in futures:
+                        future.result()
+                turn_count += len(batch)
+
+            # One log write per turn (or batch of turns) instead of one per message
+            self._flush_log()
 
             if self.done:
                 break
 
-            # Resolve next agent from the pending queue
-            resolved = self._pop_next_agent()
-            print('^'*60, flush=True)
-            print(f"POP the next agent: {resolved}", flush=True)
-            print(f"remaining agents: {self._pending_agents}", flush=True)
-            print('^'*60, flush=True)
-            if resolved:
-                next_agent = resolved
+            # Resolve the next agent(s) from the pending queue: in parallel mode everyone
+            # addressed during this batch runs next, together; otherwise one at a time
+            with self._lock:
+                if parallel:
+                    next_agents, self._pending_agents = self._pending_agents, []
+                else:
+                    resolved = self._pop_next_agent()
+                    next_agents = [resolved] if resolved else []
+            print("\n".join([
+                '^'*60,
+                f"POP the next agent: {', '.join(next_agents) or None}",
+                f"remaining agents: {self._pending_agents}",
+                '^'*60,
+            ]), flush=True)
+            if next_agents:
                 self._consecutive_fallbacks = 0
             else:
                 # Fallback to orchestrator
@@ -500,7 +611,7 @@ class TeamRun:
                     self.done_summary = "(team ended: orchestrator could not route work)"
                     print(f"\n[team] {self.done_summary}", flush=True)
                     break
-                next_agent = orch_id
+                next_agents = [orch_id]
 
         if self.done:
             print(f"\n[team] Done! Summary: {self.done_summary}", flush=True)
@@ -509,3 +620,43 @@ class TeamRun:
             print(f"\n[team] {self.done_summary}", flush=True)
 
         return self.done_summary
+
+    def _run_turn(self, client: "OpenAI", model: str, agent_id: str, turn_count: int, max_turns: int) -> None:
+        """Run one agent's turn: build its prompt from the board, then its tool loop."""
+        self._current_agent = agent_id
+        agent_entry = self._agents_by_id[agent_id]
+
+        print("\n".join([
+            f"\n{'='*60}",
+            f"  TURN {turn_count}/{max_turns} — {agent_id}",
+            f"  remaining agents: {self._pending_agents}",
+            f"{'='*60}",
+        ]), flush=True)
+
+        # Build tools and handlers; team handlers are layered over the defaults for this turn only
+        schemas, handler_overrides = self.build_agent_tools(agent_id, agent_entry)
+        call_handlers = {**tools.HANDLERS, **handler_overrides}
+
+        # Build messages
+        system_prompt = self._system_prompts[agent_id]
+        history = self.agent_histories.setdefault(agent_id, deque(maxlen=6))
+
+        board_snapshot = self.read_messages(agent_id, last_n=20)
+        # Fixed text first, per-turn data last, so the shared prefix stays cacheable
+        user_msg = (
+            "Continue working on your tasks.\n\n"
+            f"Current message board (turn {turn_count}):\n{board_snapshot}"
+        )
+
+        messages = [_system_message(system_prompt, model)]
+        messages.extend(history)
+        messages.append({"role": "user", "content": user_msg})
+
+        # Run agent loop (cap iterations so agents yield their turn)
+        reply = run_agent_loop(
+            client, model, messages, schemas, max_iterations=16, handlers=call_handlers
+        )
+
+        # Save to per-agent history (the deque drops the oldest entries)
+        history.append({"role": "user", "content": user_msg})
+        history.append({"role": "assistant", "content": reply})
@@ -0,0 +1,74 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import openai
+
+import agent
+import config
+import tools
+
+
+class FakeClient:
+    """Answers every chat completion with a fixed text reply and records the requests."""
+
+    def __init__(self, reply="done"):
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self._reply = reply
+
+    def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        message = SimpleNamespace(content=self._reply, tool_calls=None, reasoning_content=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_spawn_agent_without_chat(monkeypatch, tmp_path):
+    # Team mode never calls chat(), so the sub-agent loop must set up its own client and model
+    monkeypatch.setattr(config, "CONFIG_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "CONFIG_FILE", str(tmp_path / "config.json"))
+    monkeypatch.setattr(agent, "_client", None)
+    monkeypatch.setattr(agent, "_model", "")
+    client = FakeClient("sub-agent result")
+    monkeypatch.setattr(openai, "OpenAI", lambda: client)
+
+    result = tools.spawn_agent("summarize the file")
+
+    assert result == "sub-agent result"
+    assert client.requests[0]["model"] == config.DEFAULTS["model"]
+
+
+def _tool_call(name, args):
+    return {"id": name, "function": {"name": name, "arguments": ""}, "args": args, "args_error": ""}
+
+
+def test_spawn_agent_is_a_barrier():
+    # A spawned sub-agent may write files, so reads listed around it must not overlap it
+    events = []
+    lock = threading.Lock()
+
+    def record(label):
+        def handler(args):
+            with lock:
+                events.append(f"{label} start")
+            time.sleep(0.05)
+            with lock:
+                events.append(f"{label} end")
+            return label
+        return handler
+
+    handlers = {"read_file": lambda args: record(args["path"])(args), "spawn_agent": record("spawn")}
+    calls = [
+        _tool_call("read_file", {"path": "r1"}),
+        _tool_call("read_file", {"path": "r2"}),
+        _tool_call("spawn_agent", {"task": "t"}),
+        _tool_call("read_file", {"path": "r3"}),
+    ]
+
+    results = agent._run_tool_calls(calls, handlers)
+
+    assert results == ["r1", "r2", "spawn", "r3"]
+    spawn_start, spawn_end = events.index("spawn start"), events.index("spawn end")
+    assert spawn_end == spawn_start + 1
+    assert max(events.index("r1 end"), events.index("r2 end")) < spawn_start
+    assert events.index("r3 start") > spawn_end
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import tools
+
+
+def test_store_tool_result_keeps_newest(monkeypatch, tmp_path):
+    monkeypatch.setattr(tools, "TOOL_RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(tools, "TOOL_RESULTS_MAX_FILES", 3)
+
+    ids = []
+    for i in range(5):
+        ids.append(tools.store_tool_result(f"result {i}"))
+        # Space out mtimes so the pruning order is deterministic
+        os.utime(tmp_path / f"{ids[-1]}.txt", (i, i))
+
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{result_id}.txt" for result_id in ids[2:])
+    assert tools.get_tool_result(ids[-1]) == "result 4"
+    assert tools.get_tool_result(ids[0]).startswith("Error: no stored tool result")
+
+
+def _write_pdf(path, page_texts):
+    import pymupdf
+
+    doc = pymupdf.open()
+    for text in page_texts:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+
+
+@pytest.mark.parametrize("head_pages", [64, 1])
+def test_pdf_text_exactly_filling_budget(monkeypatch, tmp_path, head_pages):
+    # head_pages=1 sends pages 2+ through the continuation call after the first batch
+    monkeypatch.setattr(tools, "PDF_PARALLEL_MIN_PAGES", head_pages)
+    monkeypatch.setattr(tools, "PDF_MAX_WORKERS", 1)
+    path = str(tmp_path / "doc.pdf")
+    _write_pdf(path, ["first page", "second page", "third page"])
+    all_pages = tools._extract_pdf_pages(path, 0, 3, 10**6)
+
+    # Two pages fill the budget exactly, so the third still has to be read to show truncation
+    monkeypatch.setattr(tools, "MAX_CONTENT_CHARS", len("\n\n".join(all_pages[:2])))
+    assert tools._extract_pdf_text(path, 3) == all_pages
+
+    # Without a third page nothing is cut off
+    _write_pdf(path, ["first page", "second page"])
+    assert tools._extract_pdf_text(path, 2) == all_pages[:2]
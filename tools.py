@@ -1,16 +1,30 @@
+import hashlib
 import io
-import json
+import multiprocessing
 import os
+import re
+import secrets
+import signal
 import subprocess
 import tempfile
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import requests
-from bs4 import BeautifulSoup
-from markdownify import markdownify
-from openai import OpenAI
-import pymupdf
-
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+# bs4, markdownify, pymupdf, and openai are imported inside the tools that use them,
+# so importing this module (and running exec/read_file/write_file) doesn't pay for them
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # fall back to BeautifulSoup with the C-backed lxml parser
+    LexborHTMLParser = None
+
+import fetch_cache
+import jsonutil
 import skills
 
 # --- Tool schemas (sent to OpenAI) ---
@@ -160,13 +174,30 @@ TOOL_SCHEMAS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_tool_result",
+            "description": "Retrieve the full text of an earlier tool result that was truncated in the conversation to save space.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "result_id": {
+                        "type": "string",
+                        "description": "The id shown in the truncated result",
+                    },
+                },
+                "required": ["result_id"],
+            },
+        },
+    },
     {
         "type": "function",
         "function": {
             "name": "spawn_agent",
             "description": (
                 "Spawn a sub-agent to handle an independent subtask. "
-                "The sub-agent gets its own conversation with the LLM and access to all tools (except spawn_agent). "
+                "The sub-agent gets its own conversation with the LLM and access to all tools (except spawn_agent and spawn_agents). "
                 "It runs synchronously and returns its final answer. "
                 "Use this when a subtask is self-contained and can be solved independently."
             ),
@@ -182,110 +213,364 @@ TOOL_SCHEMAS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "spawn_agents",
+            "description": (
+                "Spawn several sub-agents at once, one per independent subtask, and run them concurrently. "
+                "Each behaves like spawn_agent (own conversation, all tools except spawn_agent/spawn_agents). "
+                "Returns every sub-agent's final answer, in task order. "
+                "Use this instead of repeated spawn_agent calls when the subtasks don't depend on each other."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tasks": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "maxItems": 8,
+                        "description": "Clear, self-contained descriptions, one per sub-agent (at most 8)",
+                    },
+                },
+                "required": ["tasks"],
+            },
+        },
+    },
 ]
 
+# Tools withheld from sub-agents; the spawning tools are excluded to prevent recursive spawning
+SUB_AGENT_EXCLUDED_TOOLS = frozenset({"spawn_agent", "spawn_agents"})
+SUB_AGENT_TOOLS = tuple(
+    t for t in TOOL_SCHEMAS if t["function"]["name"] not in SUB_AGENT_EXCLUDED_TOOLS
+)
+
 
 # --- Tool implementations ---
 
 
+EXEC_TIMEOUT = 30
+MAX_EXEC_OUTPUT = 256 * 1024  # bytes kept from stdout + stderr combined
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    # The command runs in its own session, so this also reaches pipeline children
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
 def exec_command(command: str) -> str:
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    # Drain both pipes as raw bytes under one shared budget; past it, kill the command
+    budget = [MAX_EXEC_OUTPUT]
+    budget_lock = threading.Lock()
+    truncated = threading.Event()
+
+    def drain(pipe, buf: bytearray) -> None:
+        with pipe:
+            while chunk := pipe.read1(65536):
+                with budget_lock:
+                    take = min(len(chunk), budget[0])
+                    budget[0] -= take
+                buf += chunk[:take]
+                if take < len(chunk):
+                    truncated.set()
+                    _kill_group(proc)
+                    break
+
+    stdout, stderr = bytearray(), bytearray()
+    readers = [
+        threading.Thread(target=drain, args=(proc.stdout, stdout), daemon=True),
+        threading.Thread(target=drain, args=(proc.stderr, stderr), daemon=True),
+    ]
+    for t in readers:
+        t.start()
+
+    deadline = time.monotonic() + EXEC_TIMEOUT
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        output = ""
-        if result.stdout:
-            output += result.stdout
-        if result.stderr:
-            output += result.stderr
-        if result.returncode != 0:
-            output += f"\n(exit code {result.returncode})"
-        return output.strip() or "(no output)"
+        proc.wait(timeout=EXEC_TIMEOUT)
     except subprocess.TimeoutExpired:
-        return "Error: command timed out after 30 seconds"
+        pass
+    # Background children can hold the pipes open after the shell exits
+    for t in readers:
+        t.join(max(0, deadline - time.monotonic()))
+    if proc.returncode is None or any(t.is_alive() for t in readers):
+        _kill_group(proc)
+        proc.wait()
+        if not truncated.is_set():
+            return f"Error: command timed out after {EXEC_TIMEOUT} seconds"
+
+    # Decode once, at the end
+    output = (stdout + stderr).decode("utf-8", errors="replace")
+    if truncated.is_set():
+        output += f"\n... (output truncated at {MAX_EXEC_OUTPUT} bytes; command killed)"
+    elif proc.returncode != 0:
+        output += f"\n(exit code {proc.returncode})"
+    return output.strip() or "(no output)"
+
+
+MAX_CONTENT_CHARS = 50000  # truncate to fit LLM context
+READ_FILE_MAX_BYTES = 4 * MAX_CONTENT_CHARS  # enough bytes for MAX_CONTENT_CHARS of any UTF-8 text
 
 
 def read_file(path: str) -> str:
     path = os.path.expanduser(path)
+    # Only the start of a huge file is useful in context, so never read past READ_FILE_MAX_BYTES
+    limit = READ_FILE_MAX_BYTES
     try:
-        with open(path) as f:
-            return f.read()
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            chunks = []
+            remaining = min(size, limit) if size else limit  # size is 0 for e.g. /proc files
+            while remaining > 0:
+                chunk = os.read(fd, remaining)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+        finally:
+            os.close(fd)
+        text = b"".join(chunks).decode("utf-8", errors="replace")
+        if size > limit:
+            text += f"\n\n... (truncated: showing the first {limit} of {size} bytes)"
+        return text
     except FileNotFoundError:
         return f"Error: file not found: {path}"
     except PermissionError:
         return f"Error: permission denied: {path}"
 
 
+WRITE_CHUNK_BYTES = 1 << 20
+
+
 def write_file(path: str, content: str) -> str:
     path = os.path.expanduser(path)
     try:
         os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "w") as f:
-            f.write(content)
-        return f"Wrote {len(content)} bytes to {path}"
+        # Encode once, then hand the bytes to the kernel directly in large chunks
+        data = memoryview(content.encode("utf-8", errors="surrogateescape"))
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            offset = 0
+            while offset < len(data):
+                offset += os.write(fd, data[offset:offset + WRITE_CHUNK_BYTES])
+        finally:
+            os.close(fd)
+        return f"Wrote {len(data)} bytes to {path}"
     except PermissionError:
         return f"Error: permission denied: {path}"
 
 
-MAX_CONTENT_CHARS = 50000  # truncate to fit LLM context
-
 FETCH_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AutoCrew/1.0",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    # Advertise every encoding urllib3 can decode here (gzip, deflate, plus br/zstd when
+    # their decoders are installed), so compressed responses are unpacked transparently
+    "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
 }
 
+_BLANK_RUN = re.compile(r"\n{3,}")
+
+# Convert fetched pages to markdown (keeps headings and links); 0 returns plain text, which is faster
+WEB_FETCH_MARKDOWN = os.environ.get("AUTOCREW_WEB_FETCH_MARKDOWN", "1") == "1"
+
+# One pooled session for all fetches, so repeat requests to a host reuse its TLS connection.
+# Sessions are safe to share for GETs, including across concurrent sub-agents.
+_SESSION = requests.Session()
+_SESSION.headers.update(FETCH_HEADERS)
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    # Retry connect errors and gateway statuses only; a read timeout already waited the full
+    # timeout, so retrying it would multiply the worst-case fetch time
+    max_retries=Retry(total=2, read=0, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
 
 def web_fetch(url: str) -> str:
+    key = f"web:{'md' if WEB_FETCH_MARKDOWN else 'text'}:{url}"
+    cached = fetch_cache.get(key)
+    if cached is not None and fetch_cache.is_fresh(cached):
+        return cached["text"]
+
     try:
-        resp = requests.get(url, headers=FETCH_HEADERS, timeout=30)
+        resp = _SESSION.get(url, timeout=30, headers=fetch_cache.validators(cached))
         resp.raise_for_status()
     except requests.RequestException as e:
         return f"Error fetching URL: {e}"
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    if resp.status_code == 304 and cached is not None:
+        fetch_cache.touch(key, cached)
+        return cached["text"]
 
-    # Remove non-content elements
-    for tag in soup(["script", "style", "nav", "header", "footer", "aside", "iframe"]):
-        tag.decompose()
+    text = _html_to_text(resp.text)
+    if not text:
+        return "Error: no readable content found"
+    fetch_cache.put(key, resp.headers, text)
+    return text
+
+
+_NON_CONTENT = "script, style, nav, header, footer, aside, iframe"
+
+
+def _html_to_text(page: str) -> str:
+    from bs4 import BeautifulSoup
+
+    if LexborHTMLParser is not None:
+        # selectolax (lexbor, C) parses the full page; only the main content reaches markdownify
+        tree = LexborHTMLParser(page)
+        # Remove non-content elements
+        for node in tree.css(_NON_CONTENT):
+            node.decompose()
+        # Try to find main content area first
+        main = tree.css_first("article") or tree.css_first("main") or tree.body or tree.root
+        if WEB_FETCH_MARKDOWN:
+            main = BeautifulSoup(main.html or "", "lxml")
+        else:
+            text = main.text(separator="\n", strip=True)
+    else:
+        soup = BeautifulSoup(page, "lxml")
+        # One CSS select pass instead of a tree walk per tag name
+        for tag in soup.select(_NON_CONTENT):
+            tag.decompose()
+        main = soup.find("article") or soup.find("main") or soup.body or soup
+        if not WEB_FETCH_MARKDOWN:
+            text = main.get_text("\n", strip=True)
 
-    # Try to find main content area first
-    main = soup.find("article") or soup.find("main") or soup.find("body")
-    html = str(main) if main else str(soup)
+    if WEB_FETCH_MARKDOWN:
+        from markdownify import MarkdownConverter
 
-    text = markdownify(html, heading_style="ATX", strip=["img"]).strip()
+        text = MarkdownConverter(heading_style="ATX", strip=["img"]).convert_soup(main).strip()
 
     # Collapse excessive blank lines
-    while "\n\n\n" in text:
-        text = text.replace("\n\n\n", "\n\n")
+    text = _BLANK_RUN.sub("\n\n", text)
 
     if len(text) > MAX_CONTENT_CHARS:
         text = text[:MAX_CONTENT_CHARS] + f"\n\n... (truncated at {MAX_CONTENT_CHARS} chars)"
 
-    return text or "Error: no readable content found"
+    return text
 
 
-def pdf_fetch(url: str) -> str:
-    try:
-        resp = requests.get(url, headers=FETCH_HEADERS, timeout=60)
-        resp.raise_for_status()
-    except requests.RequestException as e:
-        return f"Error fetching PDF: {e}"
+PDF_DOWNLOAD_CHUNK = 1024 * 1024
+# Pages read in-process before the rest of a long PDF may be split across worker processes.
+# Text-heavy PDFs reach MAX_CONTENT_CHARS well within this, so only sparse ones fan out.
+PDF_PARALLEL_MIN_PAGES = 64
+# ...and only when the rest is estimated to take longer than this to read in-process;
+# starting the workers (a fresh interpreter importing pymupdf each) costs a second or two
+PDF_PARALLEL_MIN_SECONDS = 3.0
+PDF_PAGES_PER_TASK = 16
+PDF_MAX_WORKERS = min(4, os.cpu_count() or 1)
 
-    try:
-        doc = pymupdf.open(stream=resp.content, filetype="pdf")
-    except Exception as e:
-        return f"Error parsing PDF: {e}"
+
+def _extract_pdf_pages(path: str, start: int, stop: int, budget: int) -> list[str]:
+    """Return the labelled text of pages [start, stop), stopping once their "\n\n"-joined
+    length passes budget chars. Module-level so worker processes can run it."""
+    import pymupdf
 
     pages = []
-    for i, page in enumerate(doc):
-        page_text = page.get_text().strip()
-        if page_text:
-            pages.append(f"--- Page {i + 1} ---\n{page_text}")
-    doc.close()
+    total_len = 0
+    with pymupdf.open(path, filetype="pdf") as doc:
+        for i in range(start, stop):
+            # Plain extraction: keep mediabox clipping but skip ligature/whitespace preservation
+            page_text = doc[i].get_text("text", flags=pymupdf.TEXT_MEDIABOX_CLIP).strip()
+            if page_text:
+                page = f"--- Page {i + 1} ---\n{page_text}"
+                total_len += len(page) + (2 if pages else 0)  # + the "\n\n" separator before it
+                pages.append(page)
+                # The rest would be truncated away, so don't parse the remaining pages
+                if total_len > budget:
+                    break
+    return pages
+
+
+def _extract_pdf_text(path: str, page_count: int) -> list[str]:
+    """Extract labelled page texts in page order until MAX_CONTENT_CHARS is passed."""
+    head = min(page_count, PDF_PARALLEL_MIN_PAGES)
+    started = time.monotonic()
+    pages = _extract_pdf_pages(path, 0, head, MAX_CONTENT_CHARS)
+    seconds_per_page = (time.monotonic() - started) / max(head, 1)
+    used = len("\n\n".join(pages))
+    if used > MAX_CONTENT_CHARS or head == page_count:
+        return pages
+    # Later pages are joined after these, so reserve the separator before the first of them
+    remaining = MAX_CONTENT_CHARS - used - (2 if pages else 0)
+    if PDF_MAX_WORKERS < 2 or seconds_per_page * (page_count - head) < PDF_PARALLEL_MIN_SECONDS:
+        return pages + _extract_pdf_pages(path, head, page_count, remaining)
+
+    # MuPDF extraction is CPU-bound and holds the GIL, so use processes; each worker opens
+    # the temp file itself. "spawn" avoids forking a process that has other threads running.
+    budget = remaining
+    ranges = range(head, page_count, PDF_PAGES_PER_TASK)
+    rest = []
+    try:
+        pool = ProcessPoolExecutor(
+            max_workers=PDF_MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            futures = [
+                pool.submit(_extract_pdf_pages, path, lo, min(lo + PDF_PAGES_PER_TASK, page_count), budget)
+                for lo in ranges
+            ]
+            # Consume in page order and stop the remaining work once enough text is in
+            for future in futures:
+                for page in future.result():
+                    budget -= len(page) + (2 if rest else 0)
+                    rest.append(page)
+                if budget < 0:
+                    break
+        finally:
+            pool.shutdown(cancel_futures=True)
+    except Exception:
+        # e.g. worker processes unavailable; fall back to reading the rest here
+        rest = _extract_pdf_pages(path, head, page_count, remaining)
+    return pages + rest
+
+
+def pdf_fetch(url: str) -> str:
+    import pymupdf
+
+    key = f"pdf:{url}"
+    cached = fetch_cache.get(key)
+    if cached is not None and fetch_cache.is_fresh(cached):
+        return cached["text"]
+
+    # Stream to a temp file instead of holding resp.content; MuPDF then reads pages from disk
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        try:
+            with os.fdopen(fd, "wb") as f, _SESSION.get(
+                url, stream=True, timeout=60, headers=fetch_cache.validators(cached)
+            ) as resp:
+                resp.raise_for_status()
+                if resp.status_code == 304 and cached is not None:
+                    fetch_cache.touch(key, cached)
+                    return cached["text"]
+                for chunk in resp.iter_content(PDF_DOWNLOAD_CHUNK):
+                    f.write(chunk)
+        except requests.RequestException as e:
+            return f"Error fetching PDF: {e}"
+
+        try:
+            doc = pymupdf.open(pdf_path, filetype="pdf")
+        except Exception as e:
+            return f"Error parsing PDF: {e}"
+        page_count = doc.page_count
+        doc.close()
+
+        pages = _extract_pdf_text(pdf_path, page_count)
+    finally:
+        os.remove(pdf_path)
 
     text = "\n\n".join(pages)
 
@@ -295,6 +580,7 @@ def pdf_fetch(url: str) -> str:
     if len(text) > MAX_CONTENT_CHARS:
         text = text[:MAX_CONTENT_CHARS] + f"\n\n... (truncated at {MAX_CONTENT_CHARS} chars)"
 
+    fetch_cache.put(key, resp.headers, text)
     return text
 
 
@@ -303,6 +589,11 @@ VIDEO_OUTPUT_DIR = os.path.expanduser("~/autocrew-output")
 # SDK accepts seconds as string literals
 VALID_SECONDS = ("4", "8", "12")
 VALID_SIZES = ("720x1280", "1280x720", "1024x1792", "1792x1024")
+VIDEO_MODEL = "sora-2"
+VIDEO_POLL_INITIAL_SECONDS = 3.0
+VIDEO_POLL_MAX_SECONDS = 30.0
+# Reuse an earlier video for an identical (model, prompt, seconds, size) request
+VIDEO_CACHE = os.environ.get("AUTOCREW_VIDEO_CACHE", "0") == "1"
 
 
 def generate_video(prompt: str, seconds: int = 4, size: str = "1280x720") -> str:
@@ -315,18 +606,32 @@ def generate_video(prompt: str, seconds: int = 4, size: str = "1280x720") -> str
     if size not in VALID_SIZES:
         return f"Error: size must be one of {VALID_SIZES} (got {size})"
 
+    filepath = None
+    if VIDEO_CACHE:
+        key = hashlib.sha256(f"{VIDEO_MODEL}|{prompt}|{sec_str}|{size}".encode()).hexdigest()
+        filepath = os.path.join(VIDEO_OUTPUT_DIR, f"video_{key[:16]}.mp4")
+        if os.path.exists(filepath):
+            size_kb = os.path.getsize(filepath) // 1024
+            return f"Video (cached) at {filepath} ({size_kb} KB, {sec_str}s, {size})"
+
+    from openai import OpenAI
+
     client = OpenAI()
 
-    # create_and_poll handles submission + polling in one call
+    # Poll with backoff: short jobs are noticed within seconds, long ones cost few requests
     print(f"  [video] Generating ({sec_str}s, {size})...", flush=True)
     try:
-        video = client.videos.create_and_poll(
-            model="sora-2",
+        video = client.videos.create(
+            model=VIDEO_MODEL,
             prompt=prompt,
             seconds=sec_str,
             size=size,
-            poll_interval_ms=10000,  # check every 10s
         )
+        delay = VIDEO_POLL_INITIAL_SECONDS
+        while video.status in ("queued", "in_progress"):
+            time.sleep(delay)
+            delay = min(delay * 1.5, VIDEO_POLL_MAX_SECONDS)
+            video = client.videos.retrieve(video.id)
     except Exception as e:
         return f"Error during video generation: {e}"
 
@@ -334,21 +639,76 @@ def generate_video(prompt: str, seconds: int = 4, size: str = "1280x720") -> str
         error_msg = getattr(video, "error", "unknown error")
         return f"Video generation failed (status={video.status}): {error_msg}"
 
-    # Download via SDK
+    # Download via SDK, streaming straight to disk rather than buffering the whole clip
     print(f"  [video] Downloading video...", flush=True)
+    if filepath is None:
+        # Random suffix: two videos finishing in the same second must not overwrite each other
+        filename = f"video_{time.strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(4)}.mp4"
+        filepath = os.path.join(VIDEO_OUTPUT_DIR, filename)
+    # Download to a unique temp file and rename, so an interrupted download never looks complete
+    # and concurrent identical requests don't write into the same file
+    fd, tmp_path = tempfile.mkstemp(dir=VIDEO_OUTPUT_DIR, suffix=".part")
+    os.close(fd)
     try:
-        content = client.videos.download_content(video.id)
+        with client.videos.with_streaming_response.download_content(video.id) as resp:
+            resp.stream_to_file(tmp_path)
+        os.replace(tmp_path, filepath)
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return f"Error downloading video: {e}"
 
-    filename = f"video_{time.strftime('%Y%m%d_%H%M%S')}.mp4"
-    filepath = os.path.join(VIDEO_OUTPUT_DIR, filename)
-    content.stream_to_file(filepath)
-
     size_kb = os.path.getsize(filepath) // 1024
     return f"Video saved to {filepath} ({size_kb} KB, {sec_str}s, {size})"
 
 
+TOOL_RESULTS_DIR = os.path.join(os.path.expanduser("~"), ".autocrew", "tool_results")
+# Writing a new result removes all but this many of the most recently stored ones
+TOOL_RESULTS_MAX_FILES = int(os.environ.get("AUTOCREW_TOOL_RESULTS_MAX_FILES", "500"))
+
+
+def store_tool_result(content: str) -> str:
+    """Save a tool result under its content hash and return the id."""
+    result_id = hashlib.sha256(content.encode()).hexdigest()[:16]
+    os.makedirs(TOOL_RESULTS_DIR, exist_ok=True)
+    path = os.path.join(TOOL_RESULTS_DIR, f"{result_id}.txt")
+    if os.path.exists(path):
+        os.utime(path)  # stored again, so it counts as recent when pruning
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        _prune_tool_results()
+    return result_id
+
+
+def _prune_tool_results() -> None:
+    entries = []
+    with os.scandir(TOOL_RESULTS_DIR) as it:
+        for entry in it:
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass  # removed by a concurrent prune
+    if len(entries) <= TOOL_RESULTS_MAX_FILES:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - TOOL_RESULTS_MAX_FILES]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def get_tool_result(result_id: str) -> str:
+    if not result_id.isalnum():
+        return f"Error: invalid result id: {result_id}"
+    try:
+        with open(os.path.join(TOOL_RESULTS_DIR, f"{result_id}.txt"), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return f"Error: no stored tool result: {result_id}"
+
+
 def spawn_agent(task: str) -> str:
     if _agent_loop_fn is None:
         return "Error: agent loop not registered"
@@ -359,17 +719,52 @@ def spawn_agent(task: str) -> str:
         {"role": "user", "content": task},
     ]
 
-    # Remove spawn_agent from sub-agent's tools to prevent recursive spawning
-    sub_tools = [t for t in TOOL_SCHEMAS if t["function"]["name"] != "spawn_agent"]
-
     print(f"  [sub-agent starting: {task[:80]}...]" if len(task) > 80 else f"  [sub-agent starting: {task}]")
-    result = _agent_loop_fn(messages, sub_tools)
+    result = _agent_loop_fn(messages, SUB_AGENT_TOOLS)
     print(f"  [sub-agent finished]")
     return result
 
 
+SPAWN_AGENTS_MAX_WORKERS = 8
+SPAWN_AGENTS_MAX_TASKS = SPAWN_AGENTS_MAX_WORKERS  # each sub-agent makes its own API calls
+
+
+def _spawn_one(task: str) -> str:
+    # One failed sub-agent shouldn't discard its siblings' results
+    try:
+        return spawn_agent(task)
+    except Exception as e:
+        return f"Error: sub-agent failed: {e}"
+
+
+def spawn_agents(tasks: list[str]) -> str:
+    if _agent_loop_fn is None:
+        return "Error: agent loop not registered"
+    if not isinstance(tasks, list) or not tasks or not all(isinstance(t, str) for t in tasks):
+        return "Error: tasks must be a non-empty list of strings"
+    if len(tasks) > SPAWN_AGENTS_MAX_TASKS:
+        return f"Error: at most {SPAWN_AGENTS_MAX_TASKS} tasks per call (got {len(tasks)})"
+
+    # Sub-agents spend their time waiting on the API, so threads overlap them well
+    with ThreadPoolExecutor(max_workers=min(SPAWN_AGENTS_MAX_WORKERS, len(tasks))) as pool:
+        results = list(pool.map(_spawn_one, tasks))
+
+    return "\n\n".join(
+        f"--- Sub-agent {i + 1}: {task[:80]} ---\n{result}"
+        for i, (task, result) in enumerate(zip(tasks, results))
+    )
+
+
 # --- Dispatch ---
 
+# Tools that change shared state (the filesystem, the team message board) act as barriers
+# in a batch: calls listed before one finish before it runs, later calls start after it.
+# Sub-agents can exec and write files, and generate_video writes one, so they count too.
+SERIAL_TOOLS = {
+    "exec", "write_file", "generate_video", "spawn_agent", "spawn_agents",
+    "post_message", "read_messages", "declare_done",
+}
+
 HANDLERS = {
     "exec": lambda args: exec_command(args["command"]),
     "read_file": lambda args: read_file(args["path"]),
@@ -382,13 +777,18 @@ HANDLERS = {
         args.get("size", "1280x720"),
     ),
     "use_skill": lambda args: skills.load_skill(args["name"]),
+    "get_tool_result": lambda args: get_tool_result(args["result_id"]),
     "spawn_agent": lambda args: spawn_agent(args["task"]),
+    "spawn_agents": lambda args: spawn_agents(args["tasks"]),
 }
 
 
-def run_tool(name: str, arguments: str) -> str:
-    args = json.loads(arguments)
-    handler = HANDLERS.get(name)
+def run_tool(name: str, arguments: str | dict, handlers: dict | None = None) -> str:
+    """Dispatch a tool call. `handlers` replaces the default HANDLERS table for this
+    call (e.g. team tools bound to one agent), so callers never mutate the global.
+    `arguments` may be the raw JSON string or an already-parsed dict."""
+    args = arguments if isinstance(arguments, dict) else jsonutil.loads(arguments)
+    handler = (HANDLERS if handlers is None else handlers).get(name)
     if not handler:
         return f"Error: unknown tool: {name}"
     return handler(args)